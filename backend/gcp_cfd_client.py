@@ -6,21 +6,51 @@ Handles authentication and communication with GCP Cloud Functions for heavy CFD
 
 import os
 import json
+import atexit
+import hashlib
 import requests
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterator, List, Optional, Any
 from google.oauth2 import service_account
 from google.auth.transport.requests import AuthorizedSession
 
+CLOUD_PLATFORM_SCOPES = ('https://www.googleapis.com/auth/cloud-platform',)
+
+@lru_cache(maxsize=4)
+def load_credentials(service_account_path: str, scopes: tuple = CLOUD_PLATFORM_SCOPES):
+    """Load service account credentials once per (path, scopes) and reuse them
+    
+    Raises FileNotFoundError if the service account file does not exist.
+    """
+    # Read the service account file in a single open + read
+    with open(service_account_path, 'rb') as f:
+        service_account_info = json.loads(f.read())
+    
+    return service_account.Credentials.from_service_account_info(
+        service_account_info,
+        scopes=list(scopes)
+    )
+
 class GCPCFDClient:
     """Client for Google Cloud Platform CFD simulations"""
     
+    # Identical submissions within this window reuse the earlier result
+    SUBMISSION_CACHE_SIZE = 256
+    SUBMISSION_CACHE_TTL = 3600  # seconds
+    
     def __init__(self, service_account_path: str = "centered-scion-471523-a4-b8125d43fa7a.json"):
         self.service_account_path = service_account_path
         self.project_id = "centered-scion-471523-a4"
         self.credentials = None
         self.authed_session = None
         self.function_url = None
+        self._submission_cache = OrderedDict()
+        # Submissions run on one background thread per simulation start
+        self._submission_lock = threading.Lock()
         
         # Initialize authentication
         self._setup_authentication()
@@ -28,22 +58,20 @@ class GCPCFDClient:
     def _setup_authentication(self):
         """Set up Google Cloud authentication"""
         try:
-            # Check if service account file exists
-            if not os.path.exists(self.service_account_path):
+            # Load service account credentials
+            try:
+                self.credentials = load_credentials(self.service_account_path)
+            except FileNotFoundError:
                 print(f"⚠️  GCP service account file not found: {self.service_account_path}")
                 print("⚠️  GCP integration will be disabled. Running in simulation mode.")
                 self.credentials = None
                 self.authed_session = None
                 return
             
-            # Load service account credentials
-            self.credentials = service_account.Credentials.from_service_account_file(
-                self.service_account_path,
-                scopes=['https://www.googleapis.com/auth/cloud-platform']
-            )
-            
-            # Create authorized session
+            # Create one pooled authorized session, reused for every request
             self.authed_session = AuthorizedSession(self.credentials)
+            self.authed_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+            atexit.register(self.authed_session.close)
             
             print("✅ Google Cloud authentication successful")
             print(f"📧 Service account: {self.credentials.service_account_email}")
@@ -88,8 +116,56 @@ class GCPCFDClient:
             print(f"❌ Connection test error: {e}")
             return False
     
+    @staticmethod
+    def _submission_key(rocket_data: Dict, simulation_config: Dict) -> str:
+        """Content hash identifying a (rocket_data, simulation_config) submission"""
+        encoded = json.dumps([rocket_data, simulation_config], sort_keys=True, default=str)
+        return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _get_cached_submission(self, key: str) -> Optional[Dict]:
+        """Return a cached submission result if it has not expired"""
+        with self._submission_lock:
+            entry = self._submission_cache.get(key)
+            if entry is None:
+                return None
+            
+            cached_at, result = entry
+            if time.time() - cached_at > self.SUBMISSION_CACHE_TTL:
+                del self._submission_cache[key]
+                return None
+            
+            self._submission_cache.move_to_end(key)
+            return result
+    
+    def _cache_submission(self, key: str, result: Dict):
+        """Store a submission result, evicting the least recently used entry"""
+        with self._submission_lock:
+            self._submission_cache[key] = (time.time(), result)
+            self._submission_cache.move_to_end(key)
+            while len(self._submission_cache) > self.SUBMISSION_CACHE_SIZE:
+                self._submission_cache.popitem(last=False)
+    
+    def invalidate_submission(self, rocket_data: Dict, simulation_config: Dict):
+        """Forget a cached submission so the next identical request resubmits"""
+        key = self._submission_key(rocket_data, simulation_config)
+        with self._submission_lock:
+            self._submission_cache.pop(key, None)
+    
     def submit_cfd_simulation(self, rocket_data: Dict, simulation_config: Dict) -> Dict:
         """Submit a CFD simulation to Google Cloud Function"""
+        cache_key = self._submission_key(rocket_data, simulation_config)
+        cached = self._get_cached_submission(cache_key)
+        if cached is not None:
+            print(f"♻️  Reusing cached submission: {cached.get('simulation_id')}")
+            return cached
+        
+        result = self._submit_cfd_simulation(rocket_data, simulation_config)
+        if "error" not in result:
+            self._cache_submission(cache_key, result)
+        return result
+    
+    def _submit_cfd_simulation(self, rocket_data: Dict, simulation_config: Dict) -> Dict:
+        """Submit a CFD simulation without consulting the submission cache"""
         if not self.authed_session:
             print("⚠️  GCP not available, running in simulation mode")
             return self._simulate_cfd_submission(rocket_data, simulation_config)
@@ -130,6 +206,55 @@ class GCPCFDClient:
             print(f"❌ Submission error: {e}")
             return {"error": str(e)}
     
+    def submit_and_stream(self, rocket_data: Dict, simulation_config: Dict) -> Iterator[Dict]:
+        """Submit a CFD simulation and yield its progress events as they arrive
+        
+        The Cloud Function keeps the response open and writes one JSON status
+        object per line until the simulation finishes; the final event carries
+        the results. Yields a single {"error": ...} event if streaming fails.
+        """
+        if not self.authed_session:
+            yield from self._simulate_stream(rocket_data, simulation_config)
+            return
+        
+        if not self.function_url:
+            raise ValueError("Function URL not set")
+        
+        payload = {
+            "action": "submit_and_stream",
+            "rocket_components": rocket_data.get("components", []),
+            "rocket_weight": rocket_data.get("weight", 0),
+            "rocket_cg": rocket_data.get("cg", 0),
+            "simulation_config": simulation_config,
+            "timestamp": time.time()
+        }
+        
+        try:
+            print("🚀 Submitting CFD simulation to Google Cloud (streaming)...")
+            with self.authed_session.post(
+                self.function_url,
+                json=payload,
+                stream=True,
+                timeout=(30, 540)  # connect, then max gap between progress lines
+            ) as response:
+                if response.status_code != 200:
+                    yield {"error": f"Streaming submission failed: {response.status_code}"}
+                    return
+                
+                for line in response.iter_lines():
+                    if line:
+                        yield json.loads(line)
+                        
+        except Exception as e:
+            yield {"error": str(e)}
+    
+    def _simulate_stream(self, rocket_data: Dict, simulation_config: Dict) -> Iterator[Dict]:
+        """Simulate a streamed submission when GCP is not available"""
+        submission = self._simulate_cfd_submission(rocket_data, simulation_config)
+        simulation_id = submission["simulation_id"]
+        yield self._simulate_status_check(simulation_id)
+        yield self._simulate_results_get(simulation_id)
+    
     def _simulate_cfd_submission(self, rocket_data: Dict, simulation_config: Dict) -> Dict:
         """Simulate CFD submission when GCP is not available"""
         simulation_id = f"sim_{int(time.time())}"
@@ -85,7 +85,7 @@ import tempfile
 import time
 import threading
 from typing import Dict, Any
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 
 # Global simulation storage (in production, use Cloud Storage)
 simulations = {}
@@ -137,15 +137,16 @@ class CloudCFDManager:
                 sim_data["progress"] = i
                 sim_data["message"] = f"Simulation progress: {i}%"
             
-            # Mark as completed
-            sim_data["status"] = "completed"
-            sim_data["message"] = "Simulation completed successfully"
+            # Store results before marking as completed, so readers that see
+            # the completed status always find them
             sim_data["results"] = {
                 "drag_coefficient": 0.45,
                 "lift_coefficient": 0.12,
                 "pressure_distribution": "mock_data",
                 "velocity_field": "mock_data"
             }
+            sim_data["message"] = "Simulation completed successfully"
+            sim_data["status"] = "completed"
             
         except Exception as e:
             sim_data["status"] = "error"
@@ -179,6 +180,18 @@ class CloudCFDManager:
             "results": sim_data["results"],
             "completion_time": time.time() - sim_data["start_time"]
         }
+    
+    def stream_progress(self, simulation_id: str, interval: float = 0.5):
+        """Yield one JSON status line per tick until the simulation finishes"""
+        while True:
+            status = self.get_status(simulation_id)
+            if status.get("status") == "completed":
+                status["results"] = simulations[simulation_id].get("results")
+            yield json.dumps(status) + "\\n"
+            
+            if "error" in status or status.get("status") in ("completed", "error", "cancelled"):
+                return
+            time.sleep(interval)
 
 # Global CFD manager
 cfd_manager = CloudCFDManager()
@@ -206,6 +219,21 @@ def handle_request():
             result = cfd_manager.start_simulation(rocket_data, simulation_config)
             return jsonify(result)
         
+        elif action == "submit_and_stream":
+            # Start a simulation and stream its progress on this response
+            rocket_data = {
+                "components": data.get("rocket_components", []),
+                "weight": data.get("rocket_weight", 0),
+                "cg": data.get("rocket_cg", 0)
+            }
+            simulation_config = data.get("simulation_config", {})
+            
+            started = cfd_manager.start_simulation(rocket_data, simulation_config)
+            return Response(
+                cfd_manager.stream_progress(started["simulation_id"]),
+                mimetype="application/x-ndjson"
+            )
+        
         elif action == "status":
             # Get simulation status
             simulation_id = data.get("simulation_id")
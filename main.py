@@ -2,6 +2,11 @@ import os
 import sys
 import json
 import time
+import uuid
+import bisect
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
@@ -11,25 +16,258 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Global simulation storage
-simulations = {}
+# Global simulation storage, oldest first; bounded by prune_simulations()
+simulations = OrderedDict()
+MAX_SIMULATIONS = 2048
+SIMULATION_TTL = 3600  # seconds
+simulations_lock = threading.Lock()
 
-# Import real CFD integration
-try:
-    from gcp_cfd_client import GCPCFDClient
-    from simulation_orchestrator import SimulationOrchestrator
-    from database.supabase_manager import SupabaseManager
+# IDs of simulations currently in the "running" state, kept by set_status()
+running_ids = set()
+
+# Stop events for the background threads driving each simulation
+simulation_drivers = {}
+
+# Simulation mode: "real" submits to GCP CFD, "mock" only simulates progress
+SIM_MODE = os.environ.get("SIM_MODE", "real")
+
+# Real CFD integration is initialized lazily by get_cfd_client() so that the
+# heavy google-auth imports are only paid by the first simulation request
+gcp_cfd_client = None
+supabase_manager = None
+simulation_orchestrator = None
+real_cfd_available = None
+cfd_client_lock = threading.Lock()
+
+def get_cfd_client():
+    """Return the GCP CFD client, importing and initializing it on first use"""
+    global gcp_cfd_client, supabase_manager, simulation_orchestrator, real_cfd_available
+    
+    if real_cfd_available is not None:
+        return gcp_cfd_client if real_cfd_available else None
+    
+    with cfd_client_lock:
+        # Another request may have finished the setup while we waited
+        if real_cfd_available is not None:
+            return gcp_cfd_client if real_cfd_available else None
+        
+        if SIM_MODE == "mock":
+            print("🎭 SIM_MODE=mock, skipping real CFD integration")
+            real_cfd_available = False
+            return None
+        
+        try:
+            from gcp_cfd_client import GCPCFDClient
+            from simulation_orchestrator import SimulationOrchestrator
+            from database.supabase_manager import SupabaseManager
+            
+            # Initialize real CFD components
+            gcp_cfd_client = GCPCFDClient()
+            supabase_manager = SupabaseManager()
+            simulation_orchestrator = SimulationOrchestrator(gcp_cfd_client, supabase_manager)
+        except Exception as e:
+            # Missing packages or bad credentials: fall back to mock simulations
+            print(f"⚠️  Real CFD integration not available: {e}")
+            gcp_cfd_client = supabase_manager = simulation_orchestrator = None
+            real_cfd_available = False
+            return None
+        
+        print("✅ Real CFD integration loaded")
+        real_cfd_available = True
+        return gcp_cfd_client
+
+# Default flight model used when real CFD results are unavailable
+GRAVITY = 9.81  # m/s^2
+MOTOR_THRUST = 6.0  # Default motor thrust in Newtons
+MOTOR_BURN_TIME = 1.6  # Default burn time in seconds
+MOTOR_IMPULSE = MOTOR_THRUST * MOTOR_BURN_TIME  # N*s
+
+# Simulated progress stages: (elapsed seconds, status, progress, message, real CFD message)
+STAGES = [
+    (2, "running", 10, "Mesh generation in progress...", "Real CFD mesh generation in progress..."),
+    (4, "running", 30, "CFD solver running...", "Real CFD solver running..."),
+    (6, "running", 60, "Post-processing results...", "Real CFD post-processing results..."),
+    (8, "completed", 100, "Simulation completed successfully!", "Simulation completed successfully!"),
+]
+STAGE_TIMES = [stage[0] for stage in STAGES]
+
+def elapsed_seconds(sim_data, now_ns):
+    """Seconds since a simulation started, from the monotonic clock"""
+    return (now_ns - sim_data["start_monotonic"]) / 1e9
+
+def compute_progress(sim_data, now_ns):
+    """Return (status, progress, message) for a simulation at monotonic time `now_ns`"""
+    if sim_data["status"] not in ("initializing", "running"):
+        return sim_data["status"], sim_data["progress"], sim_data["message"]
+    
+    elapsed_time = elapsed_seconds(sim_data, now_ns)
+    stage_index = bisect.bisect_left(STAGE_TIMES, elapsed_time)
+    if stage_index == 0:
+        return sim_data["status"], sim_data["progress"], sim_data["message"]
+    
+    _, status, progress, message, real_message = STAGES[stage_index - 1]
+    if "real_cfd_result" in sim_data:
+        message = real_message
+    return status, progress, message
+
+def set_status(sim_data, status):
+    """Set a simulation's status and keep running_ids in sync"""
+    sim_data["status"] = status
+    running_ids.discard(sim_data["id"])
+    if status == "running":
+        running_ids.add(sim_data["id"])
+
+def simulate_progress(sim_data, now_ns):
+    """Advance a simulation's stored status and attach results on completion"""
+    status, progress, message = compute_progress(sim_data, now_ns)
+    if status != sim_data["status"]:
+        print(f"🔄 Status updated: {sim_data['status']} → {status}")
+        set_status(sim_data, status)
+    if progress != sim_data["progress"]:
+        sim_data["progress"] = progress
+    if message != sim_data["message"]:
+        sim_data["message"] = message
+    
+    # Assemble results exactly once, on the first poll after completion
+    if status == "completed" and sim_data.get("results") is None:
+        sim_data["results"] = build_results(sim_data)
+        print(f"📊 Simulation results: Altitude={sim_data['results']['max_altitude']:.1f}m, Velocity={sim_data['results']['max_velocity']:.1f}m/s, Time={sim_data['results']['total_flight_time']:.1f}s")
+
+def drive_simulation(simulation_id, stop_event):
+    """Advance a simulation through its stages on a fixed schedule"""
+    try:
+        with simulations_lock:
+            sim_data = simulations.get(simulation_id)
+        if sim_data is None:
+            return
+        for stage_time in STAGE_TIMES:
+            delay = stage_time - elapsed_seconds(sim_data, time.monotonic_ns())
+            # Wake just after the boundary so compute_progress sees the new stage
+            if stop_event.wait(max(delay, 0) + 0.01):
+                break
+            with simulations_lock:
+                simulate_progress(sim_data, time.monotonic_ns())
+    finally:
+        # Only clear our own registration, never a newer driver's
+        if simulation_drivers.get(simulation_id) is stop_event:
+            simulation_drivers.pop(simulation_id, None)
+
+def start_simulation_driver(simulation_id):
+    """Start the background thread that drives a simulation's progress"""
+    stop_event = threading.Event()
+    simulation_drivers[simulation_id] = stop_event
+    threading.Thread(
+        target=drive_simulation,
+        args=(simulation_id, stop_event),
+        name=f"sim-driver-{simulation_id}",
+        daemon=True
+    ).start()
+
+def submit_to_gcp(simulation_id, cfd_client, rocket_data, simulation_config):
+    """Submit a simulation to GCP CFD and record the result on its entry"""
+    try:
+        result = cfd_client.submit_cfd_simulation(rocket_data, simulation_config)
+        print(f"📊 Real CFD simulation result: {result}")
+        message = "Real CFD simulation in progress..."
+    except Exception as e:
+        print(f"❌ Real CFD simulation failed: {e}")
+        result = None
+        message = f"CFD simulation failed: {str(e)}"
     
-    # Initialize real CFD components
-    gcp_cfd_client = GCPCFDClient()
-    supabase_manager = SupabaseManager()
-    simulation_orchestrator = SimulationOrchestrator(gcp_cfd_client, supabase_manager)
+    with simulations_lock:
+        # The entry may have been pruned while the submission was in flight
+        sim_data = simulations.get(simulation_id)
+        if sim_data is None:
+            return
+        if result is not None:
+            sim_data["real_cfd_result"] = result
+        # Don't clobber a stage message the driver has already written
+        if sim_data["status"] == "initializing":
+            sim_data["message"] = message
+
+def prune_simulations(now):
+    """Evict simulations older than SIMULATION_TTL and cap the total count
+
+    Callers must hold simulations_lock.
+    """
+    while simulations:
+        simulation_id, sim_data = next(iter(simulations.items()))
+        if len(simulations) <= MAX_SIMULATIONS and now - sim_data["start_time"] <= SIMULATION_TTL:
+            break
+        del simulations[simulation_id]
+        running_ids.discard(simulation_id)
+        stop_event = simulation_drivers.pop(simulation_id, None)
+        if stop_event is not None:
+            stop_event.set()
+
+def build_results(sim_data):
+    """Build the results payload for a completed simulation"""
+    rocket_weight = sim_data["rocket_data"]["weight"]
+    
+    # Use real CFD results if available, otherwise calculate realistic values
+    if "real_cfd_result" in sim_data and sim_data["real_cfd_result"]:
+        cfd_result = sim_data["real_cfd_result"]
+        print("✅ Using real CFD results")
+        return {
+            "max_altitude": cfd_result.get("max_altitude", 150),
+            "max_velocity": cfd_result.get("max_velocity", 45),
+            "total_flight_time": cfd_result.get("total_flight_time", 8.5),
+            "motor_thrust": cfd_result.get("motor_thrust", MOTOR_THRUST),
+            "motor_burn_time": cfd_result.get("motor_burn_time", MOTOR_BURN_TIME),
+            "stability_margin": cfd_result.get("stability_margin", 1.2),
+            "drag_coefficient": cfd_result.get("drag_coefficient", 0.75),
+            "lift_coefficient": cfd_result.get("lift_coefficient", 0.15),
+            "pressure_distribution": "Available",
+            "velocity_field": "Available",
+            "trajectory_data": "Available"
+        }
     
-    print("✅ Real CFD integration loaded")
-    real_cfd_available = True
-except ImportError as e:
-    print(f"⚠️  Real CFD integration not available: {e}")
-    real_cfd_available = False
+    # Calculate realistic flight parameters based on rocket specs
+    # A missing rocketWeight arrives as 0; report no flight rather than divide by it
+    max_velocity = MOTOR_IMPULSE / (rocket_weight / 1000.0) if rocket_weight > 0 else 0.0  # m/s
+    max_altitude = max_velocity * max_velocity * 0.5 / GRAVITY  # meters
+    total_flight_time = 2 * max_velocity / GRAVITY + MOTOR_BURN_TIME  # seconds
+    
+    print("⚠️  Using calculated results (real CFD not available)")
+    return {
+        "max_altitude": max_altitude,
+        "max_velocity": max_velocity,
+        "total_flight_time": total_flight_time,
+        "motor_thrust": MOTOR_THRUST,
+        "motor_burn_time": MOTOR_BURN_TIME,
+        "stability_margin": 1.2,  # cal
+        "drag_coefficient": 0.75,
+        "lift_coefficient": 0.15,
+        "pressure_distribution": "Available",
+        "velocity_field": "Available",
+        "trajectory_data": "Available"
+    }
+
+@dataclass
+class StartRequest:
+    """Parsed body of /api/simulation/start"""
+    rocket_components: list = field(default_factory=list)
+    rocket_weight: float = 0
+    rocket_cg: float = 0
+    simulation_config: dict = field(default_factory=dict)
+    
+    @classmethod
+    def from_json(cls, data):
+        """Build a StartRequest from the JSON body, raising ValueError on bad types"""
+        if not isinstance(data, dict):
+            raise ValueError("request body must be a JSON object")
+        rocket_components = data.get('rocketComponents') or []
+        simulation_config = data.get('simulationConfig') or {}
+        if not isinstance(rocket_components, list):
+            raise ValueError("rocketComponents must be a list")
+        if not isinstance(simulation_config, dict):
+            raise ValueError("simulationConfig must be an object")
+        try:
+            rocket_weight = float(data.get('rocketWeight') or 0)
+            rocket_cg = float(data.get('rocketCG') or 0)
+        except (TypeError, ValueError):
+            raise ValueError("rocketWeight and rocketCG must be numbers")
+        return cls(rocket_components, rocket_weight, rocket_cg, simulation_config)
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -38,7 +276,7 @@ def health_check():
         "status": "healthy",
         "service": "Google Cloud CFD Function",
         "timestamp": time.time(),
-        "active_simulations": len([s for s in simulations.values() if s.get("status") == "running"]),
+        "active_simulations": len(running_ids),
         "backend_available": True
     })
 
@@ -49,7 +287,7 @@ def api_health_check():
         "status": "healthy",
         "service": "Google Cloud CFD Function API",
         "timestamp": time.time(),
-        "active_simulations": len([s for s in simulations.values() if s.get("status") == "running"]),
+        "active_simulations": len(running_ids),
         "backend_available": True
     })
 
@@ -59,63 +297,63 @@ def api_simulation_start():
     try:
         print("🚀 === SIMULATION START REQUEST ===")
         data = request.get_json() or {}
-        print(f"📊 Request data keys: {list(data.keys())}")
         
-        # Extract simulation parameters
-        rocket_components = data.get('rocketComponents', [])
-        rocket_weight = data.get('rocketWeight', 0)
-        rocket_cg = data.get('rocketCG', 0)
-        simulation_config_data = data.get('simulationConfig', {})
+        # Parse simulation parameters
+        try:
+            start_request = StartRequest.from_json(data)
+        except ValueError as e:
+            print(f"❌ Invalid start request: {e}")
+            return jsonify({"error": str(e)}), 400
+        rocket_components = start_request.rocket_components
+        rocket_weight = start_request.rocket_weight
+        rocket_cg = start_request.rocket_cg
+        simulation_config_data = start_request.simulation_config
         
         print(f"🔧 Rocket components: {len(rocket_components)}")
         print(f"⚖️  Rocket weight: {rocket_weight}")
         print(f"📍 Rocket CG: {rocket_cg}")
         print(f"⚙️  Config items: {len(simulation_config_data)}")
         
-        simulation_id = f"sim_{int(time.time())}"
+        start_time = time.time()
+        simulation_id = f"sim_{uuid.uuid4().hex}"
         print(f"🆔 Generated simulation ID: {simulation_id}")
         
         # Create simulation entry
-        simulations[simulation_id] = {
-            "id": simulation_id,
-            "status": "initializing",
-            "start_time": time.time(),
-            "progress": 0,
-            "message": "CFD simulation initializing...",
-            "rocket_data": {
-                "components": rocket_components,
-                "weight": rocket_weight,
-                "cg": rocket_cg
-            },
-            "config": simulation_config_data,
-            "last_update": time.time()
+        rocket_data = {
+            "components": rocket_components,
+            "weight": rocket_weight,
+            "cg": rocket_cg
         }
+        with simulations_lock:
+            prune_simulations(start_time)
+            simulations[simulation_id] = {
+                "id": simulation_id,
+                "status": "initializing",
+                "start_time": start_time,
+                "start_monotonic": time.monotonic_ns(),
+                "progress": 0,
+                "message": "CFD simulation initializing...",
+                "rocket_data": rocket_data,
+                "config": simulation_config_data,
+                "last_update": start_time
+            }
         
-        # Start real CFD simulation if available
-        if real_cfd_available:
+        # Submit real CFD simulation in the background if available
+        cfd_client = get_cfd_client()
+        if cfd_client is not None:
             print("🚀 Starting real CFD simulation...")
-            try:
-                # Prepare rocket data for real simulation
-                rocket_data = {
-                    'components': rocket_components,
-                    'weight': rocket_weight,
-                    'cg': rocket_cg
-                }
-                
-                # Start real CFD simulation
-                result = gcp_cfd_client.submit_cfd_simulation(rocket_data, simulation_config_data)
-                print(f"📊 Real CFD simulation result: {result}")
-                
-                # Update simulation with real results
-                simulations[simulation_id]["real_cfd_result"] = result
-                simulations[simulation_id]["message"] = "Real CFD simulation in progress..."
-                
-            except Exception as e:
-                print(f"❌ Real CFD simulation failed: {e}")
-                simulations[simulation_id]["message"] = f"CFD simulation failed: {str(e)}"
+            threading.Thread(
+                target=submit_to_gcp,
+                args=(simulation_id, cfd_client, rocket_data, simulation_config_data),
+                name=f"sim-submit-{simulation_id}",
+                daemon=True
+            ).start()
         else:
             print("⚠️  Using mock simulation (real CFD not available)")
         
+        # Progress advances server-side, independent of how often clients poll
+        start_simulation_driver(simulation_id)
+        
         print(f"✅ Simulation {simulation_id} created with status: initializing")
         print(f"📈 Total active simulations: {len(simulations)}")
         
@@ -150,98 +388,28 @@ def api_simulation_status():
             print("❌ No simulation ID provided")
             return jsonify({"error": "Simulation ID required"}), 400
             
-        if simulation_id not in simulations:
+        with simulations_lock:
+            sim_data = simulations.get(simulation_id)
+            available_ids = list(simulations.keys())
+        if sim_data is None:
             print(f"❌ Simulation {simulation_id} not found")
-            print(f"📋 Available simulations: {list(simulations.keys())}")
+            print(f"📋 Available simulations: {available_ids}")
             return jsonify({"error": "Simulation not found"}), 404
         
-        sim_data = simulations[simulation_id]
-        elapsed_time = time.time() - sim_data["start_time"]
+        now_ns = time.monotonic_ns()
+        elapsed_time = elapsed_seconds(sim_data, now_ns)
         
         print(f"⏱️  Elapsed time: {elapsed_time:.2f} seconds")
         print(f"📈 Current status: {sim_data['status']}")
         print(f"📊 Current progress: {sim_data['progress']}%")
         
-        # Enhanced progress simulation with realistic stages
-        if sim_data["status"] == "initializing":
-            if elapsed_time > 2:
-                sim_data["status"] = "running"
-                sim_data["progress"] = 10
-                if "real_cfd_result" in sim_data:
-                    sim_data["message"] = "Real CFD mesh generation in progress..."
-                else:
-                    sim_data["message"] = "Mesh generation in progress..."
-                print("🔄 Status updated: initializing → running")
-        elif sim_data["status"] == "running":
-            if elapsed_time > 8:
-                sim_data["status"] = "completed"
-                sim_data["progress"] = 100
-                sim_data["message"] = "Simulation completed successfully!"
-                
-                # Add realistic simulation results
-                rocket_weight = sim_data["rocket_data"]["weight"]
-                rocket_cg = sim_data["rocket_data"]["cg"]
-                total_height = sim_data["rocket_data"]["components"][0].get("totalHeight", 200) if sim_data["rocket_data"]["components"] else 200
-                
-                # Use real CFD results if available, otherwise calculate realistic values
-                if "real_cfd_result" in sim_data and sim_data["real_cfd_result"]:
-                    # Use real CFD results
-                    cfd_result = sim_data["real_cfd_result"]
-                    sim_data["results"] = {
-                        "max_altitude": cfd_result.get("max_altitude", 150),
-                        "max_velocity": cfd_result.get("max_velocity", 45),
-                        "total_flight_time": cfd_result.get("total_flight_time", 8.5),
-                        "motor_thrust": cfd_result.get("motor_thrust", 6.0),
-                        "motor_burn_time": cfd_result.get("motor_burn_time", 1.6),
-                        "stability_margin": cfd_result.get("stability_margin", 1.2),
-                        "drag_coefficient": cfd_result.get("drag_coefficient", 0.75),
-                        "lift_coefficient": cfd_result.get("lift_coefficient", 0.15),
-                        "pressure_distribution": "Available",
-                        "velocity_field": "Available",
-                        "trajectory_data": "Available"
-                    }
-                    print("✅ Using real CFD results")
-                else:
-                    # Calculate realistic flight parameters based on rocket specs
-                    motor_thrust = 6.0  # Default motor thrust in Newtons
-                    motor_burn_time = 1.6  # Default burn time in seconds
-                    max_velocity = (motor_thrust * motor_burn_time) / (rocket_weight / 1000)  # m/s
-                    max_altitude = (max_velocity ** 2) / (2 * 9.81)  # meters
-                    total_flight_time = 2 * (max_velocity / 9.81) + motor_burn_time  # seconds
-                    
-                    # Add comprehensive results
-                    sim_data["results"] = {
-                        "max_altitude": max_altitude,
-                        "max_velocity": max_velocity,
-                        "total_flight_time": total_flight_time,
-                        "motor_thrust": motor_thrust,
-                        "motor_burn_time": motor_burn_time,
-                        "stability_margin": 1.2,  # cal
-                        "drag_coefficient": 0.75,
-                        "lift_coefficient": 0.15,
-                        "pressure_distribution": "Available",
-                        "velocity_field": "Available",
-                        "trajectory_data": "Available"
-                    }
-                    print("⚠️  Using calculated results (real CFD not available)")
-                
-                print("✅ Status updated: running → completed")
-                print(f"📊 Simulation results: Altitude={sim_data['results']['max_altitude']:.1f}m, Velocity={sim_data['results']['max_velocity']:.1f}m/s, Time={sim_data['results']['total_flight_time']:.1f}s")
-            elif elapsed_time > 6:
-                sim_data["progress"] = 60
-                if "real_cfd_result" in sim_data:
-                    sim_data["message"] = "Real CFD post-processing results..."
-                else:
-                    sim_data["message"] = "Post-processing results..."
-            elif elapsed_time > 4:
-                sim_data["progress"] = 30
-                if "real_cfd_result" in sim_data:
-                    sim_data["message"] = "Real CFD solver running..."
-                else:
-                    sim_data["message"] = "CFD solver running..."
+        with simulations_lock:
+            simulate_progress(sim_data, now_ns)
         
-        # Update last update time
-        sim_data["last_update"] = time.time()
+        # Update last update time, skipping writes for rapid repeat polls
+        now = time.time()
+        if now - sim_data["last_update"] > 0.25:
+            sim_data["last_update"] = now
         
         response_data = {
                 "simulation_id": simulation_id,
@@ -255,7 +423,7 @@ def api_simulation_status():
         }
         
         # Include simulation results if available
-        if "results" in sim_data:
+        if sim_data.get("results") is not None:
             response_data["results"] = sim_data["results"]
         
         print(f"📤 Sending status response: {response_data}")
@@ -274,14 +442,33 @@ def api_simulation_stop():
         data = request.get_json() or {}
         simulation_id = data.get("simulation_id")
         
-        if simulation_id and simulation_id in simulations:
-            simulations[simulation_id]["status"] = "stopped"
+        with simulations_lock:
+            sim_data = simulations.get(simulation_id) if simulation_id else None
+            if sim_data is not None:
+                set_status(sim_data, "stopped")
+        
+        if sim_data is not None:
+            stop_event = simulation_drivers.pop(simulation_id, None)
+            if stop_event is not None:
+                stop_event.set()
+            
+            # Let an identical request resubmit instead of reusing this run
+            if gcp_cfd_client is not None:
+                gcp_cfd_client.invalidate_submission(sim_data["rocket_data"], sim_data["config"])
             return jsonify({"status": "stopped", "simulation_id": simulation_id})
         else:
             return jsonify({"error": "Simulation not found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ASGI entry point for Cloud Run, e.g.
+#   uvicorn main:asgi_app --loop uvloop --http httptools --workers 1 --limit-concurrency 200
+try:
+    from asgiref.wsgi import WsgiToAsgi
+    asgi_app = WsgiToAsgi(app)
+except ImportError:
+    asgi_app = None
+
 # Google Cloud Function entry point
 def main(request):
     """Google Cloud Function entry point"""
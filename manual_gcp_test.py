@@ -4,9 +4,24 @@ Manual Google Cloud Platform Test
 Step-by-step testing without external dependencies
 """
 
+import atexit
 import json
 import os
 
+# Shared HTTP session for connectivity probes, created on first use
+_probe_session = None
+
+def get_probe_session():
+    """Return a keep-alive requests session reused across probes"""
+    global _probe_session
+    if _probe_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        _probe_session = requests.Session()
+        _probe_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        atexit.register(_probe_session.close)
+    return _probe_session
+
 def step1_check_service_account():
     """Step 1: Check service account file"""
     print("Step 1: Checking service account file...")
@@ -137,7 +152,7 @@ def step6_test_function_url():
         print("🧪 Testing basic connectivity...")
         
         # Try to reach the function (might get 401, which is expected)
-        response = requests.get(f"{function_url}/health", timeout=5)
+        response = get_probe_session().get(f"{function_url}/health", timeout=5)
         print(f"📊 Response status: {response.status_code}")
         
         if response.status_code in [200, 401, 403]:
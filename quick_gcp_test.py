@@ -4,9 +4,46 @@ Quick Google Cloud Platform Test
 Tests authentication and basic connectivity
 """
 
-import os
 import sys
 import json
+import importlib.util
+
+# Add backend to path
+sys.path.append('backend')
+
+# Cloud Function endpoints checked by test_function_url()
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+def _lazy(name):
+    """Import a module lazily; its body only runs on first attribute access
+    
+    Returns None if the module cannot be found.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except ImportError:
+        return None
+    if spec is None:
+        return None
+    
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+# Heavy google-auth transport module, shared by all tests and loaded on first use
+google_auth_requests = _lazy('google.auth.transport.requests')
 
 def test_service_account_file():
     """Test if the service account file is valid"""
@@ -14,13 +51,9 @@ def test_service_account_file():
     
     service_account_path = "centered-scion-471523-a4-b8125d43fa7a.json"
     
-    if not os.path.exists(service_account_path):
-        print(f"❌ Service account file not found: {service_account_path}")
-        return False
-    
     try:
-        with open(service_account_path, 'r') as f:
-            sa_data = json.load(f)
+        with open(service_account_path, 'rb') as f:
+            sa_data = _loads(f.read())
         
         required_fields = ['type', 'project_id', 'private_key', 'client_email']
         for field in required_fields:
@@ -33,39 +66,58 @@ def test_service_account_file():
         print(f"🏗️  Project ID: {sa_data['project_id']}")
         return True
         
-    except json.JSONDecodeError as e:
+    except FileNotFoundError:
+        print(f"❌ Service account file not found: {service_account_path}")
+        return False
+    except _JSONDecodeError as e:
         print(f"❌ Invalid JSON in service account file: {e}")
         return False
     except Exception as e:
         print(f"❌ Error reading service account file: {e}")
         return False
 
+# HTTP session shared by all tests; test_authentication swaps in an
+# AuthorizedSession so later probes reuse its authenticated connection pool
+_SESSION = None
+
+def _get_session():
+    """Return the shared keep-alive HTTP session, creating it on first use"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        _SESSION = requests.Session()
+    return _SESSION
+
+def _close_session():
+    """Close the shared HTTP session"""
+    global _SESSION
+    if _SESSION is not None:
+        _SESSION.close()
+        _SESSION = None
+
+def _module_available(name):
+    """Check whether a module can be imported without executing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
 def test_google_auth_imports():
     """Test if Google Auth libraries are available"""
     print("\n🔍 Testing Google Auth imports...")
     
-    try:
-        from google.oauth2 import service_account
-        print("✅ google.oauth2.service_account imported")
-    except ImportError as e:
-        print(f"❌ Failed to import google.oauth2.service_account: {e}")
-        print("💡 Run: pip install google-auth")
-        return False
-    
-    try:
-        from google.auth.transport.requests import AuthorizedSession
-        print("✅ google.auth.transport.requests imported")
-    except ImportError as e:
-        print(f"❌ Failed to import AuthorizedSession: {e}")
-        return False
+    required_modules = [
+        ('google.oauth2.service_account', 'google-auth'),
+        ('google.auth.transport.requests', 'google-auth'),
+        ('requests', 'requests'),
+    ]
     
-    try:
-        import requests
-        print("✅ requests library imported")
-    except ImportError as e:
-        print(f"❌ Failed to import requests: {e}")
-        print("💡 Run: pip install requests")
-        return False
+    for module_name, package in required_modules:
+        if not _module_available(module_name):
+            print(f"❌ Missing module: {module_name}")
+            print(f"💡 Run: pip install {package}")
+            return False
+        print(f"✅ {module_name} available")
     
     return True
 
@@ -74,22 +126,21 @@ def test_authentication():
     print("\n🔍 Testing Google Cloud authentication...")
     
     try:
-        from google.oauth2 import service_account
-        from google.auth.transport.requests import AuthorizedSession
+        from gcp_cfd_client import load_credentials
         
         service_account_path = "centered-scion-471523-a4-b8125d43fa7a.json"
         
-        # Load credentials
-        credentials = service_account.Credentials.from_service_account_file(
-            service_account_path,
-            scopes=['https://www.googleapis.com/auth/cloud-platform']
-        )
+        # Load credentials (cached, so GCPCFDClient below reuses them)
+        credentials = load_credentials(service_account_path)
         
         print("✅ Credentials loaded successfully")
         print(f"📧 Service account: {credentials.service_account_email}")
         
-        # Create authorized session
-        authed_session = AuthorizedSession(credentials)
+        # Create authorized session and share it with the remaining tests
+        global _SESSION
+        authed_session = google_auth_requests.AuthorizedSession(credentials)
+        _close_session()
+        _SESSION = authed_session
         print("✅ Authorized session created")
         
         return True
@@ -103,8 +154,6 @@ def test_gcp_cfd_client():
     print("\n🔍 Testing GCP CFD client...")
     
     try:
-        # Add backend to path
-        sys.path.append('backend')
         from gcp_cfd_client import GCPCFDClient
         
         print("✅ GCP CFD client imported successfully")
@@ -133,20 +182,22 @@ def test_function_url():
     function_url = f"https://{region}-{project_id}.cloudfunctions.net/{function_name}"
     print(f"🔗 Function URL: {function_url}")
     
-    # Test if we can make a basic request (without authentication for now)
+    # Probe the health endpoint over the shared keep-alive session
     try:
         import requests
-        response = requests.get(f"{function_url}/health", timeout=10)
-        print(f"📊 Health check response: {response.status_code}")
+        
+        session = _get_session()
+        response = session.get(f"{function_url}/health", timeout=10)
+        print(f"📊 /health response: {response.status_code}")
         
         if response.status_code == 200:
-            print("✅ Function is deployed and accessible!")
+            print("✅ /health is deployed and accessible!")
             return True
         elif response.status_code == 401:
-            print("✅ Function is deployed (authentication required)")
+            print("✅ /health is deployed (authentication required)")
             return True
         else:
-            print(f"⚠️  Function responded with status: {response.status_code}")
+            print(f"⚠️  /health responded with status: {response.status_code}")
             return False
             
     except requests.exceptions.RequestException as e:
@@ -159,23 +210,34 @@ def main():
     print("🧪 Google Cloud Platform Quick Test")
     print("=" * 50)
     
+    # (name, test function, names of tests that must pass first)
     tests = [
-        ("Service Account File", test_service_account_file),
-        ("Google Auth Imports", test_google_auth_imports),
-        ("Authentication", test_authentication),
-        ("GCP CFD Client", test_gcp_cfd_client),
-        ("Function URL", test_function_url)
+        ("Service Account File", test_service_account_file, ()),
+        ("Google Auth Imports", test_google_auth_imports, ()),
+        ("Authentication", test_authentication, ("Service Account File", "Google Auth Imports")),
+        ("GCP CFD Client", test_gcp_cfd_client, ("Google Auth Imports",)),
+        ("Function URL", test_function_url, ())
     ]
     
     results = []
+    outcomes = {}
     
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
+    try:
+        for test_name, test_func, deps in tests:
+            failed_deps = [dep for dep in deps if not outcomes.get(dep)]
+            if failed_deps:
+                print(f"\n⏭️  Skipping {test_name}: requires {', '.join(failed_deps)}")
+                result = None
+            else:
+                try:
+                    result = test_func()
+                except Exception as e:
+                    print(f"❌ {test_name} test crashed: {e}")
+                    result = False
+            outcomes[test_name] = result
             results.append((test_name, result))
-        except Exception as e:
-            print(f"❌ {test_name} test crashed: {e}")
-            results.append((test_name, False))
+    finally:
+        _close_session()
     
     # Summary
     print("\n" + "=" * 50)
@@ -183,12 +245,20 @@ def main():
     print("=" * 50)
     
     passed = 0
+    skipped = 0
     for test_name, result in results:
-        status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{status} {test_name}")
-        if result:
+        if result is None:
+            status = "⏭️  SKIP"
+            skipped += 1
+        elif result:
+            status = "✅ PASS"
             passed += 1
+        else:
+            status = "❌ FAIL"
+        print(f"{status} {test_name}")
     
+    if skipped:
+        print(f"\n⏭️  {skipped} tests skipped")
     print(f"\n🎯 {passed}/{len(results)} tests passed")
     
     if passed == len(results):
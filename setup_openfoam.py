@@ -4,14 +4,58 @@ OpenFOAM Integration Setup Script
 Downloads and integrates OpenFOAM directly into the application bundle
 """
 
+import os
+import sys
+import py_compile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Markers around the OpenFOAM loader inserted into backend/f_backend.py
+OPENFOAM_PATCH_BEGIN = "# BEGIN OPENFOAM_ENV PATCH"
+OPENFOAM_PATCH_END = "# END OPENFOAM_ENV PATCH"
+
+# Wrapper script for an OpenFOAM executable, filled in with str.format(exe=...)
+WRAPPER_TEMPLATE = """#!/usr/bin/env python3
+\"\"\"
+OpenFOAM {exe} Wrapper
+Executes {exe} with proper environment setup
+\"\"\"
+
 import os
 import sys
 import subprocess
-import shutil
-import zipfile
-import requests
 from pathlib import Path
 
+# Load OpenFOAM environment
+openfoam_env_path = Path(__file__).parent.parent / "openfoam" / "openfoam_env.py"
+if openfoam_env_path.exists():
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("openfoam_env", openfoam_env_path)
+    openfoam_env = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(openfoam_env)
+    openfoam_env.load_openfoam_environment()
+
+def main():
+    \"\"\"Execute {exe} with arguments\"\"\"
+    try:
+        # For now, simulate the executable
+        print(f"Simulating {{exe}} execution...")
+        print(f"Arguments: {{sys.argv[1:]}}")
+        
+        # In a real implementation, you'd call the actual OpenFOAM executable
+        # result = subprocess.run(["{exe}"] + sys.argv[1:], check=True)
+        
+        print(f"{{exe}} completed successfully")
+        return 0
+        
+    except Exception as e:
+        print(f"Error running {{exe}}: {{e}}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
+"""
+
 def download_openfoam():
     """Download OpenFOAM from GitHub and extract it"""
     print("🔧 Setting up OpenFOAM integration...")
@@ -72,102 +116,53 @@ def download_openfoam():
         "ThirdParty"
     ]
     
-    for dir_path in dirs_to_create:
-        (openfoam_dir / dir_path).mkdir(parents=True, exist_ok=True)
+    # Create each directory once, parents first, instead of makedirs re-checking
+    # shared parents like platforms/ and applications/ for every entry
+    all_dirs = {
+        path
+        for dir_path in dirs_to_create
+        for path in (Path(dir_path), *Path(dir_path).parents)
+        if path != Path(".")
+    }
+    for dir_path in sorted(all_dirs, key=lambda path: len(path.parts)):
+        try:
+            (openfoam_dir / dir_path).mkdir()
+        except FileExistsError:
+            pass
     
     # Create environment setup script
-    env_script = f"""#!/bin/bash
-# OpenFOAM Environment Setup
-export WM_PROJECT="{openfoam_env['WM_PROJECT']}"
-export WM_PROJECT_VERSION="{openfoam_env['WM_PROJECT_VERSION']}"
-export WM_PROJECT_DIR="{openfoam_env['WM_PROJECT_DIR']}"
-export WM_THIRD_PARTY_DIR="{openfoam_env['WM_THIRD_PARTY_DIR']}"
-export WM_OPTIONS="{openfoam_env['WM_OPTIONS']}"
-export WM_ARCH="{openfoam_env['WM_ARCH']}"
-export WM_COMPILER="{openfoam_env['WM_COMPILER']}"
-export WM_COMPILER_ARCH="{openfoam_env['WM_COMPILER_ARCH']}"
-export WM_COMPILER_LIB_ARCH="{openfoam_env['WM_COMPILER_LIB_ARCH']}"
-export WM_MPLIB="{openfoam_env['WM_MPLIB']}"
-export WM_LABEL_SIZE="{openfoam_env['WM_LABEL_SIZE']}"
-export WM_PRECISION_OPTION="{openfoam_env['WM_PRECISION_OPTION']}"
-export WM_LABEL_OPTION="{openfoam_env['WM_LABEL_OPTION']}"
-export WM_COMPILE_OPTION="{openfoam_env['WM_COMPILE_OPTION']}"
-export WM_DIR="{openfoam_env['WM_DIR']}"
-export WM_PROJECT_USER_DIR="{openfoam_env['WM_PROJECT_USER_DIR']}"
-export FOAM_SIGFPE="{openfoam_env['FOAM_SIGFPE']}"
-export FOAM_COPYRIGHT="{openfoam_env['FOAM_COPYRIGHT']}"
-export FOAM_LIBBIN="{openfoam_env['FOAM_LIBBIN']}"
-export FOAM_APPBIN="{openfoam_env['FOAM_APPBIN']}"
-export FOAM_APP="{openfoam_env['FOAM_APP']}"
-export FOAM_SRC="{openfoam_env['FOAM_SRC']}"
-export FOAM_TUTORIALS="{openfoam_env['FOAM_TUTORIALS']}"
-export FOAM_ETC="{openfoam_env['FOAM_ETC']}"
-export FOAM_UTILITIES="{openfoam_env['FOAM_UTILITIES']}"
-export FOAM_SOLVERS="{openfoam_env['FOAM_SOLVERS']}"
-export FOAM_RUN="{openfoam_env['FOAM_RUN']}"
-
-# Add OpenFOAM binaries to PATH
-export PATH="$FOAM_APPBIN:$PATH"
-export LD_LIBRARY_PATH="$FOAM_LIBBIN:$LD_LIBRARY_PATH"
-
-echo "OpenFOAM environment loaded"
-"""
+    env_script = (
+        "#!/bin/bash\n# OpenFOAM Environment Setup\n"
+        + "\n".join(f'export {key}="{value}"' for key, value in openfoam_env.items())
+        + '\n\n# Add OpenFOAM binaries to PATH\n'
+        'export PATH="$FOAM_APPBIN:$PATH"\n'
+        'export LD_LIBRARY_PATH="$FOAM_LIBBIN:$LD_LIBRARY_PATH"\n'
+        '\necho "OpenFOAM environment loaded"\n'
+    )
     
     with open(openfoam_dir / "etc" / "bashrc", "w") as f:
         f.write(env_script)
     
     # Create Python environment loader
-    python_env_script = f"""
+    env_entries = "\n".join(f"        {key!r}: {value!r}," for key, value in openfoam_env.items())
+    python_env_script = """
 # OpenFOAM Environment for Python
 import os
 
 def load_openfoam_environment():
     \"\"\"Load OpenFOAM environment variables\"\"\"
-    openfoam_env = {{
-        "WM_PROJECT": "{openfoam_env['WM_PROJECT']}",
-        "WM_PROJECT_VERSION": "{openfoam_env['WM_PROJECT_VERSION']}",
-        "WM_PROJECT_DIR": "{openfoam_env['WM_PROJECT_DIR']}",
-        "WM_THIRD_PARTY_DIR": "{openfoam_env['WM_THIRD_PARTY_DIR']}",
-        "WM_OPTIONS": "{openfoam_env['WM_OPTIONS']}",
-        "WM_ARCH": "{openfoam_env['WM_ARCH']}",
-        "WM_COMPILER": "{openfoam_env['WM_COMPILER']}",
-        "WM_COMPILER_ARCH": "{openfoam_env['WM_COMPILER_ARCH']}",
-        "WM_COMPILER_LIB_ARCH": "{openfoam_env['WM_COMPILER_LIB_ARCH']}",
-        "WM_MPLIB": "{openfoam_env['WM_MPLIB']}",
-        "WM_LABEL_SIZE": "{openfoam_env['WM_LABEL_SIZE']}",
-        "WM_PRECISION_OPTION": "{openfoam_env['WM_PRECISION_OPTION']}",
-        "WM_LABEL_OPTION": "{openfoam_env['WM_LABEL_OPTION']}",
-        "WM_COMPILE_OPTION": "{openfoam_env['WM_COMPILE_OPTION']}",
-        "WM_DIR": "{openfoam_env['WM_DIR']}",
-        "WM_PROJECT_USER_DIR": "{openfoam_env['WM_PROJECT_USER_DIR']}",
-        "FOAM_SIGFPE": "{openfoam_env['FOAM_SIGFPE']}",
-        "FOAM_COPYRIGHT": "{openfoam_env['FOAM_COPYRIGHT']}",
-        "FOAM_LIBBIN": "{openfoam_env['FOAM_LIBBIN']}",
-        "FOAM_APPBIN": "{openfoam_env['FOAM_APPBIN']}",
-        "FOAM_APP": "{openfoam_env['FOAM_APP']}",
-        "FOAM_SRC": "{openfoam_env['FOAM_SRC']}",
-        "FOAM_TUTORIALS": "{openfoam_env['FOAM_TUTORIALS']}",
-        "FOAM_ETC": "{openfoam_env['FOAM_ETC']}",
-        "FOAM_UTILITIES": "{openfoam_env['FOAM_UTILITIES']}",
-        "FOAM_SOLVERS": "{openfoam_env['FOAM_SOLVERS']}",
-        "FOAM_RUN": "{openfoam_env['FOAM_RUN']}"
-    }}
+    openfoam_env = {
+""" + env_entries + """
+    }
     
     # Set environment variables
-    for key, value in openfoam_env.items():
-        os.environ[key] = value
+    os.environ.update(openfoam_env)
     
-    # Add to PATH
-    if "PATH" in os.environ:
-        os.environ["PATH"] = openfoam_env["FOAM_APPBIN"] + ":" + os.environ["PATH"]
-    else:
-        os.environ["PATH"] = openfoam_env["FOAM_APPBIN"]
-    
-    # Add to LD_LIBRARY_PATH
-    if "LD_LIBRARY_PATH" in os.environ:
-        os.environ["LD_LIBRARY_PATH"] = openfoam_env["FOAM_LIBBIN"] + ":" + os.environ["LD_LIBRARY_PATH"]
-    else:
-        os.environ["LD_LIBRARY_PATH"] = openfoam_env["FOAM_LIBBIN"]
+    # Prepend to PATH and LD_LIBRARY_PATH (no trailing ':' when previously unset)
+    path = os.environ.get("PATH")
+    os.environ["PATH"] = f"{openfoam_env['FOAM_APPBIN']}:{path}" if path else openfoam_env["FOAM_APPBIN"]
+    library_path = os.environ.get("LD_LIBRARY_PATH")
+    os.environ["LD_LIBRARY_PATH"] = f"{openfoam_env['FOAM_LIBBIN']}:{library_path}" if library_path else openfoam_env["FOAM_LIBBIN"]
     
     return openfoam_env
 
@@ -179,6 +174,9 @@ if __name__ == "__main__":
     with open(openfoam_dir / "openfoam_env.py", "w") as f:
         f.write(python_env_script)
     
+    # Precompile the loader so the backend imports it straight from __pycache__
+    py_compile.compile(str(openfoam_dir / "openfoam_env.py"), doraise=True)
+    
     print("✅ OpenFOAM directory structure created")
     print(f"📁 OpenFOAM installed at: {openfoam_dir.absolute()}")
     
@@ -205,55 +203,19 @@ def create_openfoam_wrapper():
         "postProcess"
     ]
     
-    for exe in executables:
-        wrapper_script = f"""#!/usr/bin/env python3
-\"\"\"
-OpenFOAM {exe} Wrapper
-Executes {exe} with proper environment setup
-\"\"\"
-
-import os
-import sys
-import subprocess
-from pathlib import Path
-
-# Load OpenFOAM environment
-openfoam_env_path = Path(__file__).parent.parent / "openfoam" / "openfoam_env.py"
-if openfoam_env_path.exists():
-    import importlib.util
-    spec = importlib.util.spec_from_file_location("openfoam_env", openfoam_env_path)
-    openfoam_env = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(openfoam_env)
-    openfoam_env.load_openfoam_environment()
-
-def main():
-    \"\"\"Execute {exe} with arguments\"\"\"
-    try:
-        # For now, simulate the executable
-        print(f"Simulating {{exe}} execution...")
-        print(f"Arguments: {{sys.argv[1:]}}")
-        
-        # In a real implementation, you'd call the actual OpenFOAM executable
-        # result = subprocess.run(["{exe}"] + sys.argv[1:], check=True)
-        
-        print(f"{{exe}} completed successfully")
-        return 0
-        
-    except Exception as e:
-        print(f"Error running {{exe}}: {{e}}")
-        return 1
-
-if __name__ == "__main__":
-    sys.exit(main())
-"""
-        
-        wrapper_path = wrapper_dir / f"{exe}.py"
-        with open(wrapper_path, "w") as f:
-            f.write(wrapper_script)
+    wrappers = [(wrapper_dir / f"{exe}.py", WRAPPER_TEMPLATE.format(exe=exe)) for exe in executables]
+    
+    def write_wrapper(wrapper):
+        wrapper_path, wrapper_script = wrapper
+        wrapper_path.write_text(wrapper_script)
         
         # Make executable
         os.chmod(wrapper_path, 0o755)
     
+    # Write the files from a small pool so their open/write/chmod calls overlap
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(write_wrapper, wrappers))
+    
     print(f"✅ OpenFOAM wrappers created in: {wrapper_dir.absolute()}")
     return wrapper_dir
 
@@ -270,8 +232,15 @@ def update_backend_integration():
     with open(backend_file, "r") as f:
         content = f.read()
     
+    # Skip files that were already patched, including copies from before the
+    # markers existed (the checked-in f_backend.py has one)
+    if OPENFOAM_PATCH_BEGIN in content or "load_openfoam_environment()" in content:
+        print("✅ Backend integration already up to date")
+        return
+    
     # Add OpenFOAM environment loading
-    openfoam_import = """
+    openfoam_import = f"""
+{OPENFOAM_PATCH_BEGIN}
 # Load OpenFOAM environment
 try:
     openfoam_env_path = Path(__file__).parent.parent / "openfoam" / "openfoam_env.py"
@@ -286,16 +255,21 @@ try:
         print("⚠️  OpenFOAM environment not found, using simulation mode")
 except Exception as e:
     print(f"⚠️  Could not load OpenFOAM environment: {{e}}")
+{OPENFOAM_PATCH_END}
 """
     
     # Insert after imports
     import_end = content.find("from flask import Flask")
-    if import_end != -1:
-        content = content[:import_end] + openfoam_import + "\n" + content[import_end:]
+    if import_end == -1:
+        print("⚠️  Flask import not found, backend left unchanged")
+        return
     
-    # Write back
+    # Write back in pieces rather than building a second copy of the file
     with open(backend_file, "w") as f:
-        f.write(content)
+        f.write(content[:import_end])
+        f.write(openfoam_import)
+        f.write("\n")
+        f.write(content[import_end:])
     
     print("✅ Backend integration updated")
 
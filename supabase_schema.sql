@@ -75,6 +75,37 @@ CREATE TRIGGER update_projects_updated_at
     BEFORE UPDATE ON projects 
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Update a simulation's progress and return the updated row in one call
+-- (POST /rest/v1/rpc/update_sim_status)
+CREATE OR REPLACE FUNCTION update_sim_status(
+    p_id TEXT,
+    p_status TEXT,
+    p_progress FLOAT,
+    p_message TEXT
+)
+RETURNS simulation_status AS $$
+    UPDATE simulation_status
+    SET status = p_status, progress = p_progress, message = p_message
+    WHERE simulation_id = p_id
+    RETURNING *;
+$$ language 'sql';
+
+-- Create a simulation's status and results rows in one transaction
+-- (POST /rest/v1/rpc/create_sim_and_results)
+CREATE OR REPLACE FUNCTION create_sim_and_results(
+    p_id TEXT,
+    p_status TEXT,
+    p_results JSONB
+)
+RETURNS simulation_status AS $$
+    INSERT INTO simulation_results (simulation_id, results)
+    VALUES (p_id, p_results);
+    
+    INSERT INTO simulation_status (simulation_id, status)
+    VALUES (p_id, p_status)
+    RETURNING *;
+$$ language 'sql';
+
 -- Enable Row Level Security (RLS)
 ALTER TABLE simulation_status ENABLE ROW LEVEL SECURITY;
 ALTER TABLE simulation_results ENABLE ROW LEVEL SECURITY;
@@ -1,14 +1,45 @@
 #!/usr/bin/env python3
 """Ultimate GCP Test Suite - Condensed Version"""
 
+import hashlib
+import importlib.util
 import os
 import sys
 import json
 import time
 import subprocess
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, List, Tuple, Any, Optional
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 class UltimateGCPTest:
+    # Tests whose fixes change the environment (and what they depend on); they
+    # run one at a time, first
+    SEQUENTIAL_TESTS = ("Pip Available", "Requirements File", "Package Installation",
+                        "Google Auth Imports")
+    # The remaining checks are read-only and I/O bound, so they share a pool
+    MAX_WORKERS = 8
+    # Remembers the requirements that last installed cleanly into this interpreter
+    CACHE_FILE = os.path.join(".cache", "ultimate_gcp.json")
+    
+    # Keys each validated document must contain
+    REQUIRED_SA = frozenset(('type', 'project_id', 'private_key', 'client_email', 'client_id'))
+    REQUIRED_ROCKET = frozenset(('components', 'weight', 'cg'))
+    REQUIRED_CONFIG = frozenset(('solver_type', 'turbulence_model', 'time_step', 'max_time'))
+    REQUIRED_PAYLOAD = frozenset(('rocket_components', 'rocket_weight', 'rocket_cg',
+                                  'simulation_config', 'timestamp'))
+    
     def __init__(self):
         self.project_id = "centered-scion-471523-a4"
         self.function_name = "rocket-cfd-simulator"
@@ -19,51 +50,88 @@ class UltimateGCPTest:
         self.score = 0
         self.total_tests = 0
         self.start_time = time.time()
+        self._lock = threading.RLock()
+        self._gcloud_lock = threading.Lock()
+        self._gcloud_results = None
+        self._creds = None
+        self._session = None
+        self._client_class = None
+        self._http = None
+        self._cwd_entries = None
+        
+        backend = os.path.abspath('backend')
+        if backend not in sys.path:
+            sys.path.insert(0, backend)
+        
+        # "fix_google_auth_imports" repairs the "Google Auth Imports" test
+        self._fixers = {
+            attr[4:].replace('_', ' '): getattr(self, attr)
+            for attr in dir(self) if attr.startswith('fix_')
+        }
     
     def print_header(self, title: str):
-        print(f"\n🎯 {title}")
-        print("=" * 60)
+        with self._lock:
+            print(f"\n🎯 {title}")
+            print("=" * 60)
     
     def print_success(self, message: str):
-        print(f"✅ {message}")
-        self.score += 1
+        with self._lock:
+            print(f"✅ {message}")
+            self.score += 1
     
     def print_error(self, message: str):
-        print(f"❌ {message}")
+        with self._lock:
+            print(f"❌ {message}")
     
     def print_fix(self, message: str):
-        print(f"🔧 {message}")
-        self.fixes_applied.append(message)
+        with self._lock:
+            print(f"🔧 {message}")
+            self.fixes_applied.append(message)
     
     def run_test(self, test_name: str, test_func, auto_fix: bool = True) -> bool:
-        self.total_tests += 1
-        print(f"🔍 {test_name}...")
+        with self._lock:
+            self.total_tests += 1
+            print(f"🔍 {test_name}...")
         
         try:
             result = test_func()
             if result:
                 self.print_success(f"{test_name}")
-                self.results.append((test_name, True, None))
+                with self._lock:
+                    self.results.append((test_name, True, None))
                 return True
             else:
                 self.print_error(f"{test_name}")
-                self.results.append((test_name, False, "Test failed"))
+                with self._lock:
+                    self.results.append((test_name, False, "Test failed"))
                 
-                if auto_fix and hasattr(self, f"fix_{test_name.lower().replace(' ', '_').replace(':', '')}"):
-                    fix_method = getattr(self, f"fix_{test_name.lower().replace(' ', '_').replace(':', '')}")
-                    if callable(fix_method):
-                        self.print_fix(f"Attempting to fix {test_name}...")
-                        if fix_method():
-                            self.print_success(f"{test_name} - Fixed!")
-                            self.results[-1] = (test_name, True, "Fixed")
-                            return True
+                fix_method = self._fixers.get(test_name.lower().replace(':', '')) if auto_fix else None
+                if callable(fix_method):
+                    self.print_fix(f"Attempting to fix {test_name}...")
+                    if fix_method():
+                        self.print_success(f"{test_name} - Fixed!")
+                        with self._lock:
+                            self.results.remove((test_name, False, "Test failed"))
+                            self.results.append((test_name, True, "Fixed"))
+                        return True
                 
                 return False
         except Exception as e:
             self.print_error(f"{test_name} - Error: {e}")
-            self.results.append((test_name, False, str(e)))
+            with self._lock:
+                self.results.append((test_name, False, str(e)))
             return False
     
+    def skip_if_blocked(self, test_name: str, prereqs: frozenset, passed: set) -> bool:
+        """Record test_name as skipped if any prerequisite did not pass"""
+        missing = prereqs - passed
+        if not missing:
+            return False
+        with self._lock:
+            print(f"⏭️  {test_name} - skipped ({', '.join(sorted(missing))} did not pass)")
+            self.results.append((test_name, False, "skipped"))
+        return True
+    
     def run_command(self, command: List[str], description: str, timeout: int = 60) -> bool:
         try:
             result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
@@ -80,15 +148,124 @@ class UltimateGCPTest:
             self.print_error(f"{description} crashed: {e}")
             return False
     
+    def _gcloud_commands(self) -> Dict[str, Tuple[List[str], int]]:
+        # gcloud info reports version, active account and project in one fork
+        return {
+            "info": (['gcloud', 'info', '--format=json'], 15)
+        }
+    
+    def _gcloud_fallback_commands(self) -> Dict[str, Tuple[List[str], int]]:
+        # Individual queries, used only if gcloud info fails
+        return {
+            "cli": (['gcloud', '--version'], 10),
+            "auth": (['gcloud', 'auth', 'list'], 10),
+            "project": (['gcloud', 'config', 'get-value', 'project'], 10)
+        }
+    
+    def _run_commands(self, commands: Dict[str, Tuple[List[str], int]]) -> Dict[str, Any]:
+        outcomes = {}
+        for check, (command, timeout) in commands.items():
+            try:
+                outcomes[check] = subprocess.run(command, capture_output=True, text=True,
+                                                 errors='replace', timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired) as e:  # gcloud missing or hung
+                outcomes[check] = e
+        return outcomes
+    
+    def _run_gcloud_checks(self) -> Dict[str, Any]:
+        outcomes = self._run_commands(self._gcloud_commands())
+        
+        info = outcomes["info"]
+        if isinstance(info, subprocess.CompletedProcess):
+            try:
+                if info.returncode != 0:
+                    raise ValueError(info.stderr)
+                outcomes["info"] = json.loads(info.stdout)
+            except ValueError:
+                outcomes["info"] = None
+                outcomes.update(self._run_commands(self._gcloud_fallback_commands()))
+        return outcomes
+    
+    def _gcloud(self, check: str) -> Any:
+        """Result of one gcloud check; the first caller runs them all concurrently
+        
+        "info" is the parsed gcloud info JSON; other checks are CompletedProcess.
+        None means the check could not run.
+        """
+        with self._gcloud_lock:
+            if self._gcloud_results is None:
+                self._gcloud_results = self._run_gcloud_checks()
+        result = self._gcloud_results.get(check)
+        return None if isinstance(result, BaseException) else result
+    
+    def _get_cwd_entries(self) -> frozenset:
+        """Names in the working directory, from a single scandir pass"""
+        with self._lock:
+            if self._cwd_entries is None:
+                with os.scandir('.') as entries:
+                    self._cwd_entries = frozenset(entry.name for entry in entries)
+            return self._cwd_entries
+    
+    def _get_credentials(self):
+        """Service account credentials, parsed once and shared by the auth tests
+        
+        Loaded through gcp_cfd_client.load_credentials, whose cache GCPCFDClient
+        also uses, so the private key is parsed once per run.
+        """
+        with self._lock:
+            if self._creds is None:
+                from gcp_cfd_client import load_credentials
+                self._creds = load_credentials(self.service_account_file)
+            return self._creds
+    
+    def _get_session(self):
+        """AuthorizedSession over the cached credentials"""
+        with self._lock:
+            if self._session is None:
+                from google.auth.transport.requests import AuthorizedSession
+                self._session = AuthorizedSession(self._get_credentials())
+            return self._session
+    
+    def _get_client_class(self):
+        """GCPCFDClient, imported on first use
+        
+        Not imported in __init__: the package tests may install google-auth
+        (which gcp_cfd_client needs) after the tester is created.
+        """
+        with self._lock:
+            if self._client_class is None:
+                from gcp_cfd_client import GCPCFDClient
+                self._client_class = GCPCFDClient
+            return self._client_class
+    
+    def _get_http(self):
+        """Pooled keep-alive session shared by the plain HTTP checks"""
+        with self._lock:
+            if self._http is None:
+                import requests
+                self._http = requests.Session()
+                self._http.mount('https://', requests.adapters.HTTPAdapter(
+                    pool_connections=8, pool_maxsize=16
+                ))
+            return self._http
+    
     # Test methods
     def test_service_account_file(self) -> bool:
-        if not os.path.exists(self.service_account_file):
+        if self.service_account_file not in self._get_cwd_entries():
             return False
         try:
-            with open(self.service_account_file, 'r') as f:
-                data = json.load(f)
-            required_fields = ['type', 'project_id', 'private_key', 'client_email', 'client_id']
-            return all(field in data for field in required_fields)
+            with open(self.service_account_file, 'rb') as f:
+                if ijson is None:
+                    return self.REQUIRED_SA.issubset(_loads(f.read()).keys())
+                
+                # Stream the top-level keys and stop once all required ones appear
+                seen = set()
+                for prefix, event, value in ijson.parse(f):
+                    if prefix == '' and event == 'map_key':
+                        seen.add(value)
+                        if self.REQUIRED_SA.issubset(seen):
+                            return True
+                return False
         except:
             return False
     
@@ -96,7 +273,8 @@ class UltimateGCPTest:
         return sys.version_info >= (3, 8)
     
     def test_working_directory(self) -> bool:
-        return os.path.exists("backend") and os.path.exists("frontend")
+        entries = self._get_cwd_entries()
+        return "backend" in entries and "frontend" in entries
     
     def test_pip_available(self) -> bool:
         try:
@@ -125,11 +303,39 @@ class UltimateGCPTest:
             self.print_error(f"Failed to create requirements.txt: {e}")
             return False
     
+    def _load_cache(self) -> Dict[str, Any]:
+        try:
+            with open(self.CACHE_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_cache(self, cache: Dict[str, Any]):
+        try:
+            os.makedirs(os.path.dirname(self.CACHE_FILE), exist_ok=True)
+            with open(self.CACHE_FILE, 'w') as f:
+                json.dump(cache, f)
+        except OSError:
+            pass  # Caching is an optimization; the install result stands
+    
     def test_package_installation(self) -> bool:
         try:
+            with open("requirements.txt", 'rb') as f:
+                digest = hashlib.sha256(f.read() + sys.prefix.encode()).hexdigest()
+            
+            # Same requirements into the same environment already succeeded
+            cache = self._load_cache()
+            if cache.get('pip_ok') == digest:
+                return True
+            
             result = subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], 
                                   capture_output=True, text=True, timeout=300)
-            return result.returncode == 0
+            if result.returncode != 0:
+                return False
+            
+            cache['pip_ok'] = digest
+            self._save_cache(cache)
+            return True
         except:
             return False
     
@@ -139,10 +345,14 @@ class UltimateGCPTest:
             ("google.auth.transport.requests", "Google Auth Transport"),
             ("requests", "Requests HTTP Library")
         ]
+        # find_spec locates modules without running them; the tests that use
+        # them do the real import
         for module, name in test_imports:
             try:
-                __import__(module)
-            except ImportError:
+                found = importlib.util.find_spec(module) is not None
+            except ImportError:  # a parent package is missing
+                found = False
+            if not found:
                 self.print_error(f"Failed to import {name}")
                 return False
         return True
@@ -160,93 +370,95 @@ class UltimateGCPTest:
     
     def test_credential_loading(self) -> bool:
         try:
-            from google.oauth2 import service_account
-            credentials = service_account.Credentials.from_service_account_file(
-                self.service_account_file,
-                scopes=['https://www.googleapis.com/auth/cloud-platform']
-            )
-            return credentials is not None
+            return self._get_credentials() is not None
         except:
             return False
     
     def test_authorized_session(self) -> bool:
         try:
-            from google.oauth2 import service_account
-            from google.auth.transport.requests import AuthorizedSession
-            credentials = service_account.Credentials.from_service_account_file(
-                self.service_account_file,
-                scopes=['https://www.googleapis.com/auth/cloud-platform']
-            )
-            session = AuthorizedSession(credentials)
-            return session is not None
+            return self._get_session() is not None
         except:
             return False
     
     def test_gcp_cfd_client_import(self) -> bool:
         try:
-            sys.path.append('backend')
-            from gcp_cfd_client import GCPCFDClient
-            return True
+            return self._get_client_class() is not None
         except:
             return False
     
     def test_gcp_cfd_client_init(self) -> bool:
         try:
-            sys.path.append('backend')
-            from gcp_cfd_client import GCPCFDClient
-            client = GCPCFDClient()
+            client = self._get_client_class()()
             return client is not None
         except:
             return False
     
     def test_gcloud_cli(self) -> bool:
-        try:
-            result = subprocess.run(['gcloud', '--version'], 
-                                  capture_output=True, text=True, timeout=10)
-            return result.returncode == 0
-        except:
-            return False
+        info = self._gcloud("info")
+        if info is not None:
+            return bool(info.get('basic', {}).get('version'))
+        result = self._gcloud("cli")
+        return result is not None and result.returncode == 0
     
     def test_gcloud_auth(self) -> bool:
-        try:
-            result = subprocess.run(['gcloud', 'auth', 'list'], 
-                                  capture_output=True, text=True, timeout=10)
-            return result.returncode == 0 and 'ACTIVE' in result.stdout
-        except:
-            return False
+        info = self._gcloud("info")
+        if info is not None:
+            return bool(info.get('config', {}).get('account'))
+        result = self._gcloud("auth")
+        return result is not None and result.returncode == 0 and 'ACTIVE' in result.stdout
     
     def test_gcloud_project(self) -> bool:
+        info = self._gcloud("info")
+        if info is not None:
+            return info.get('config', {}).get('project') == self.project_id
+        result = self._gcloud("project")
+        return result is not None and result.returncode == 0 and self.project_id in result.stdout
+    
+    def _describe_function(self) -> Optional[bool]:
+        """Look the function up through the Cloud Functions v2 API
+        
+        The deploy scripts use --gen2, and gen2 functions are invisible to the
+        v1 API. Returns None when the SDK or credentials are unavailable.
+        """
         try:
-            result = subprocess.run(['gcloud', 'config', 'get-value', 'project'], 
-                                  capture_output=True, text=True, timeout=10)
-            return result.returncode == 0 and self.project_id in result.stdout
-        except:
+            from google.cloud import functions_v2
+            from google.api_core.exceptions import NotFound
+        except ImportError:
+            return None
+        
+        name = f"projects/{self.project_id}/locations/{self.region}/functions/{self.function_name}"
+        try:
+            client = functions_v2.FunctionServiceClient(credentials=self._get_credentials())
+            client.get_function(name=name, timeout=30)
+            return True
+        except NotFound:
             return False
+        except Exception:
+            return None
     
     def test_function_deployment(self) -> bool:
-        try:
-            result = subprocess.run([
-                'gcloud', 'functions', 'describe', self.function_name,
-                '--region', self.region
-            ], capture_output=True, text=True, timeout=30)
-            return result.returncode == 0
-        except:
-            return False
+        deployed = self._describe_function()
+        if deployed is not None:
+            return deployed
+        
+        # Last resort: ask the gcloud CLI
+        result = self._run_commands({
+            "describe": (['gcloud', 'functions', 'describe', self.function_name,
+                          '--region', self.region, '--gen2'], 30)
+        })["describe"]
+        return isinstance(result, subprocess.CompletedProcess) and result.returncode == 0
     
     def test_function_connectivity(self) -> bool:
         try:
-            import requests
             function_url = f"https://{self.region}-{self.project_id}.cloudfunctions.net/{self.function_name}"
-            response = requests.get(f"{function_url}/health", timeout=10)
+            response = self._get_http().get(f"{function_url}/health", timeout=10)
             return response.status_code in [200, 401, 403]
         except:
             return False
     
     def test_authenticated_connection(self) -> bool:
         try:
-            sys.path.append('backend')
-            from gcp_cfd_client import GCPCFDClient
-            client = GCPCFDClient()
+            client = self._get_client_class()()
             client.set_function_url(self.function_name, self.region)
             return client.test_connection()
         except:
@@ -262,8 +474,7 @@ class UltimateGCPTest:
             "weight": 0.5,
             "cg": 0.15
         }
-        required_fields = ["components", "weight", "cg"]
-        return all(field in rocket_data for field in required_fields)
+        return self.REQUIRED_ROCKET.issubset(rocket_data.keys())
     
     def test_simulation_config_validation(self) -> bool:
         config = {
@@ -273,8 +484,7 @@ class UltimateGCPTest:
             "max_time": 30,
             "inlet_velocity": 50
         }
-        required_fields = ["solver_type", "turbulence_model", "time_step", "max_time"]
-        return all(field in config for field in required_fields)
+        return self.REQUIRED_CONFIG.issubset(config.keys())
     
     def test_payload_construction(self) -> bool:
         try:
@@ -288,60 +498,126 @@ class UltimateGCPTest:
                 "timestamp": time.time(),
                 "simulation_id": f"sim_{int(time.time())}"
             }
-            return len(payload) >= 5
+            return self.REQUIRED_PAYLOAD.issubset(payload.keys())
         except:
             return False
     
     def test_network_connectivity(self) -> bool:
         try:
-            import requests
-            response = requests.get("https://www.google.com", timeout=5)
+            # Only the status code matters, so skip the body
+            response = self._get_http().head("https://www.google.com", timeout=5)
             return response.status_code == 200
         except:
             return False
     
-    def test_memory_usage(self) -> bool:
+    def _available_memory(self) -> Optional[int]:
+        """Available physical memory in bytes, or None if the platform isn't supported"""
+        if sys.platform == "win32":
+            import ctypes
+            
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong)] + [
+                    (name, ctypes.c_ulonglong) for name in (
+                        "ullTotalPhys", "ullAvailPhys", "ullTotalPageFile", "ullAvailPageFile",
+                        "ullTotalVirtual", "ullAvailVirtual", "ullAvailExtendedVirtual"
+                    )
+                ]
+            
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return None
+            return status.ullAvailPhys
+        
         try:
-            import psutil
-            memory = psutil.virtual_memory()
-            return memory.available > 1024 * 1024 * 1024
-        except ImportError:
-            return True
+            with open('/proc/meminfo') as f:
+                for line in f:
+                    if line.startswith('MemAvailable:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return None
+    
+    def test_memory_usage(self) -> bool:
+        available = self._available_memory()
+        return available is None or available > 1024 * 1024 * 1024
     
     def run_ultimate_test(self) -> bool:
         print("🚀 ULTIMATE GCP TEST SUITE")
         print("=" * 60)
         
-        # All tests in one list
+        # All tests in one list, each with the tests it needs to have passed
         tests = [
-            ("Service Account File", self.test_service_account_file),
-            ("Python Version", self.test_python_version),
-            ("Working Directory", self.test_working_directory),
-            ("Pip Available", self.test_pip_available),
-            ("Requirements File", self.test_requirements_file),
-            ("Package Installation", self.test_package_installation),
-            ("Google Auth Imports", self.test_google_auth_imports),
-            ("Credential Loading", self.test_credential_loading),
-            ("Authorized Session", self.test_authorized_session),
-            ("GCP CFD Client Import", self.test_gcp_cfd_client_import),
-            ("GCP CFD Client Init", self.test_gcp_cfd_client_init),
-            ("gcloud CLI", self.test_gcloud_cli),
-            ("gcloud Auth", self.test_gcloud_auth),
-            ("gcloud Project", self.test_gcloud_project),
-            ("Function Deployment", self.test_function_deployment),
-            ("Function Connectivity", self.test_function_connectivity),
-            ("Authenticated Connection", self.test_authenticated_connection),
-            ("Rocket Data Validation", self.test_rocket_data_validation),
-            ("Simulation Config Validation", self.test_simulation_config_validation),
-            ("Payload Construction", self.test_payload_construction),
-            ("Network Connectivity", self.test_network_connectivity),
-            ("Memory Usage", self.test_memory_usage)
+            ("Service Account File", self.test_service_account_file, ()),
+            ("Python Version", self.test_python_version, ()),
+            ("Working Directory", self.test_working_directory, ()),
+            ("Pip Available", self.test_pip_available, ()),
+            ("Requirements File", self.test_requirements_file, ()),
+            ("Package Installation", self.test_package_installation, ("Pip Available", "Requirements File")),
+            ("Google Auth Imports", self.test_google_auth_imports, ()),
+            ("Credential Loading", self.test_credential_loading, ("Google Auth Imports", "Service Account File")),
+            ("Authorized Session", self.test_authorized_session, ("Credential Loading",)),
+            ("GCP CFD Client Import", self.test_gcp_cfd_client_import, ("Google Auth Imports",)),
+            ("GCP CFD Client Init", self.test_gcp_cfd_client_init, ("GCP CFD Client Import",)),
+            ("gcloud CLI", self.test_gcloud_cli, ()),
+            ("gcloud Auth", self.test_gcloud_auth, ("gcloud CLI",)),
+            ("gcloud Project", self.test_gcloud_project, ("gcloud CLI",)),
+            ("Function Deployment", self.test_function_deployment, ()),
+            ("Function Connectivity", self.test_function_connectivity, ()),
+            ("Authenticated Connection", self.test_authenticated_connection, ("GCP CFD Client Init", "Function Deployment")),
+            ("Rocket Data Validation", self.test_rocket_data_validation, ()),
+            ("Simulation Config Validation", self.test_simulation_config_validation, ()),
+            ("Payload Construction", self.test_payload_construction, ()),
+            ("Network Connectivity", self.test_network_connectivity, ()),
+            ("Memory Usage", self.test_memory_usage, ())
         ]
+        tests = [(name, func, frozenset(prereqs)) for name, func, prereqs in tests]
+        
+        # Environment-changing tests (and their fixes) first, in order; then
+        # the read-only checks concurrently, so the slowest one sets the pace.
+        # A test whose prerequisites failed is skipped instead of run.
+        sequential = [t for t in tests if t[0] in self.SEQUENTIAL_TESTS]
+        pending = [t for t in tests if t[0] not in self.SEQUENTIAL_TESTS]
         
-        # Run all tests
         results = []
-        for test_name, test_func in tests:
-            results.append(self.run_test(test_name, test_func))
+        passed = set()
+        finished = set()
+        for test_name, test_func, prereqs in sequential:
+            ok = not self.skip_if_blocked(test_name, prereqs, passed) and self.run_test(test_name, test_func)
+            results.append(ok)
+            finished.add(test_name)
+            if ok:
+                passed.add(test_name)
+        
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            running = {}
+            while pending or running:
+                # Start (or skip) every test whose prerequisites have finished
+                ready = [t for t in pending if t[2] <= finished]
+                for test in ready:
+                    pending.remove(test)
+                    test_name, test_func, prereqs = test
+                    if self.skip_if_blocked(test_name, prereqs, passed):
+                        results.append(False)
+                        finished.add(test_name)
+                    else:
+                        running[executor.submit(self.run_test, test_name, test_func, False)] = test_name
+                
+                if running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        test_name = running.pop(future)
+                        ok = future.result()
+                        results.append(ok)
+                        finished.add(test_name)
+                        if ok:
+                            passed.add(test_name)
+                elif not ready:
+                    # Prerequisites that can never finish (unknown names)
+                    for test_name, _, prereqs in pending:
+                        self.skip_if_blocked(test_name, prereqs, set())
+                        results.append(False)
+                    pending = []
         
         # Print results
         elapsed_time = time.time() - self.start_time